@@ -1,4 +1,30 @@
-from .models import APIKey
+from django.conf import settings
+
+from .cache import get_lookup_cache
+from .models import APIKey, apikey_cache_key
+
+
+def get_user_from_token(token):
+    """
+    I return the user owning the APIKey `token`.
+    If you set `EASYREST_APIKEY_CACHE_TIMEOUT` in your settings,
+    I keep the answer in the EasyRest lookup cache for that many
+    seconds.
+    """
+    timeout = getattr(settings, 'EASYREST_APIKEY_CACHE_TIMEOUT', None)
+    if not token:
+        return
+    if timeout:
+        user = get_lookup_cache().get(apikey_cache_key(token))
+        if user is not None:
+            return user
+    try:
+        user = APIKey.objects.select_related('user').get(token=token).user
+    except APIKey.DoesNotExist:
+        return
+    if timeout:
+        get_lookup_cache().set(apikey_cache_key(token), user, timeout)
+    return user
 
 
 def get_user_from_request(request):
@@ -7,16 +33,8 @@ def get_user_from_request(request):
 
 
 def get_user_from_GET_param(request, param_name):
-    token = request.GET.get(param_name)
-    try:
-        return APIKey.objects.get(token=token).user
-    except APIKey.DoesNotExist:
-        pass
+    return get_user_from_token(request.GET.get(param_name))
 
 
 def get_user_from_request_header(request, param_name):
-    token = request.META.get(param_name)
-    try:
-        return APIKey.objects.get(token=token).user
-    except APIKey.DoesNotExist:
-        pass
+    return get_user_from_token(request.META.get(param_name))
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.cache import get_cache as _get_cache
+
+_caches = {}
+
+
+def get_cache():
+    """
+    I return the cache EasyRest keeps its shared state in.
+    Set `EASYREST_CACHE` in your settings to the alias of one of
+    your `CACHES` to use something other than the default cache.
+    """
+    return _get_cache_for(getattr(settings, 'EASYREST_CACHE', 'default'))
+
+
+def get_lookup_cache():
+    """
+    I return the cache EasyRest keeps read-mostly lookups in, like the
+    user owning each API key. Set `EASYREST_LOOKUP_CACHE` to the alias
+    of one of your `CACHES` to keep them apart from the shared state;
+    it defaults to the same cache.
+    """
+    alias = getattr(settings, 'EASYREST_LOOKUP_CACHE', None)
+    return _get_cache_for(alias) if alias else get_cache()
+
+
+def _get_cache_for(alias):
+    if alias not in _caches:
+        _caches[alias] = _get_cache(alias)
+    return _caches[alias]
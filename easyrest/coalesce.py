@@ -0,0 +1,102 @@
+import hashlib
+import json
+import threading
+import time
+
+from .cache import get_cache
+
+
+def request_key(resource, get_params, user=None, *extra):
+    """
+    I build the key identifying a request: the resource,
+    the normalized GET params, the page and the user.
+    """
+    params = dict(get_params)
+    page = params.pop('page', None) or 1
+    raw = json.dumps([resource.name,
+                      sorted(params.items()),
+                      str(page),
+                      user.pk if user else None] + list(extra))
+    return 'easyrest:{}:{}'.format(
+        resource.name, hashlib.sha1(raw.encode('utf-8')).hexdigest())
+
+
+class _Call(object):
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Coalescer(object):
+    """
+    I make concurrent identical requests within a worker wait on a
+    single in-flight computation and share its result.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def run(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+
+def run_across_processes(key, func, timeout, ttl=1, poll_interval=0.05):
+    """
+    I extend coalescing across processes by taking a lock in the
+    EasyRest cache. Whoever holds the lock computes the result and
+    leaves it in the cache for `ttl` seconds; everyone else polls for it
+    and computes it themselves if it doesn't show up in `timeout`, or as
+    soon as the lock is released without leaving a result.
+    """
+    cache = get_cache()
+    result_key = '{}:result'.format(key)
+    lock_key = '{}:lock'.format(key)
+
+    result = cache.get(result_key)
+    if result is not None:
+        return result
+
+    if cache.add(lock_key, 1, timeout):
+        try:
+            result = func()
+            cache.set(result_key, result, ttl)
+        finally:
+            cache.delete(lock_key)
+        return result
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        time.sleep(poll_interval)
+        result = cache.get(result_key)
+        if result is not None:
+            return result
+        # The lock is gone but no result was left: the computation
+        # failed, or the result was too big for the cache
+        if cache.get(lock_key) is None:
+            break
+    return func()
+
+
+coalescer = Coalescer()
@@ -1,4 +1,5 @@
 from django.conf.urls import url, patterns
+from .ownership import OwnedIds
 from .views import ItemView, ListView
 
 
@@ -7,7 +8,11 @@ class API(object):
         self.resources = []
 
     def register(self, resource):
-        self.resources.append(resource())
+        resource = resource()
+        if resource.index_owned_ids and resource.user_field_to_restrict_by:
+            resource.owned_ids = OwnedIds(resource)
+            resource.owned_ids.connect()
+        self.resources.append(resource)
 
     def get_urls(self):
         urls = []
@@ -1,12 +1,21 @@
+import hashlib
+
 from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 
+from .cache import get_lookup_cache
+
 
 class APIKey(models.Model):
     token = models.CharField(unique=True, max_length=16)
     user = models.ForeignKey('auth.user')
 
     def save(self, *args, **kwargs):
+        # Forget the user cached for the token we're replacing
+        if self.token:
+            forget_apikey(self.token)
         # Generate unique token
         unique = False
         while not unique:
@@ -15,3 +24,17 @@ class APIKey(models.Model):
                 self.token = token
                 unique = True
         super(APIKey, self).save(*args, **kwargs)
+
+
+def apikey_cache_key(token):
+    return 'easyrest:apikey:{}'.format(
+        hashlib.sha1(token.encode('utf-8')).hexdigest())
+
+
+def forget_apikey(token):
+    get_lookup_cache().delete(apikey_cache_key(token))
+
+
+@receiver(post_delete, sender=APIKey)
+def forget_deleted_apikey(sender, instance, **kwargs):
+    forget_apikey(instance.token)
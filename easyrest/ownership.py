@@ -0,0 +1,137 @@
+from array import array
+from bisect import bisect_left
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.signals import post_save, pre_delete, pre_save
+
+from .cache import get_cache
+
+# Past this many ids, a `pk__in` filter costs more than the join
+MAX_IDS_IN_FILTER = 500
+
+
+class OwnedIds(object):
+    """
+    I keep, for each user, the sorted pks of the instances of a
+    resource's model they own through `user_field_to_restrict_by`.
+
+    The ids live in the EasyRest cache as a compact array. They are
+    built from the database the first time they're needed, and forgotten
+    whenever an instance of any model along `user_field_to_restrict_by`
+    (say, the item or its `Profile`) is saved or deleted, so the next
+    request builds them again. Only paths of foreign keys are supported,
+    since changes to the other relations don't send these signals.
+    """
+    def __init__(self, resource):
+        self.resource = resource
+        self.model = resource.model
+        self.path = resource.user_field_to_restrict_by
+        self.paths = self.get_paths()
+
+    def get_paths(self):
+        """
+        I return, for every model along `user_field_to_restrict_by`,
+        the paths from it to the user.
+        """
+        paths = {}
+        model = self.model
+        parts = self.path.split('__')
+        for index, part in enumerate(parts):
+            paths.setdefault(model, []).append('__'.join(parts[index:]))
+            field, _, direct, m2m = model._meta.get_field_by_name(part)
+            if not direct or m2m or not field.rel:
+                raise ImproperlyConfigured(
+                    "{}: index_owned_ids needs user_field_to_restrict_by "
+                    "to be a path of foreign keys, {} isn't one".format(
+                        self.resource.name, part))
+            model = field.rel.to
+        return paths
+
+    def connect(self):
+        uid = 'easyrest.ownership.{}'.format(self.resource.name)
+        for model in self.paths:
+            pre_save.connect(self.remember_owners, sender=model,
+                             dispatch_uid=uid)
+            post_save.connect(self.saved, sender=model, dispatch_uid=uid)
+            # Related rows may be gone by `post_delete`
+            pre_delete.connect(self.deleted, sender=model, dispatch_uid=uid)
+
+    def cache_key(self, user_id):
+        return 'easyrest:owned_ids:{}:{}'.format(self.resource.name, user_id)
+
+    def get_owner_ids(self, sender, instance, stored=False):
+        """
+        I return the ids of the users owning `instance`, as stored in
+        the database if `stored` is set.
+        """
+        owner_ids = set()
+        for path in self.paths[sender]:
+            if '__' not in path and not stored:
+                # Read the foreign key column, it saves a query
+                owner_ids.add(getattr(
+                    instance, sender._meta.get_field(path).attname))
+            elif instance.pk is not None:
+                owner_ids.update(
+                    sender._default_manager.filter(pk=instance.pk)
+                    .values_list(path, flat=True))
+        owner_ids.discard(None)
+        return owner_ids
+
+    def get(self, user_id):
+        ids = get_cache().get(self.cache_key(user_id))
+        if ids is None:
+            ids = self.rebuild(user_id)
+        return ids
+
+    def rebuild(self, user_id):
+        ids = array('l', self.model.objects
+                    .filter(**{self.path: user_id})
+                    .order_by('pk')
+                    .values_list('pk', flat=True))
+        self._store(user_id, ids)
+        return ids
+
+    def forget(self, user_id):
+        get_cache().delete(self.cache_key(user_id))
+
+    def _store(self, user_id, ids):
+        get_cache().set(self.cache_key(user_id), ids,
+                        self.resource.owned_ids_timeout)
+
+    def contains(self, user_id, pk):
+        return self._has(self.get(user_id), pk)
+
+    def filter(self, qs, user_id):
+        ids = self.get(user_id)
+        if not ids:
+            return qs.none()
+        if ids[-1] - ids[0] + 1 == len(ids):
+            return qs.filter(pk__range=(ids[0], ids[-1]))
+        if len(ids) <= MAX_IDS_IN_FILTER:
+            return qs.filter(pk__in=list(ids))
+        return qs.filter(**{self.path: user_id})
+
+    def _has(self, ids, pk):
+        index = bisect_left(ids, pk)
+        return index < len(ids) and ids[index] == pk
+
+    def remember_owners(self, sender, instance, **kwargs):
+        previous_owner_ids = getattr(
+            instance, '_easyrest_previous_owner_ids', {})
+        previous_owner_ids[self.resource.name] = self.get_owner_ids(
+            sender, instance, stored=True)
+        instance._easyrest_previous_owner_ids = previous_owner_ids
+
+    def saved(self, sender, instance, **kwargs):
+        # Updating the cached ids in place could lose a concurrent
+        # update, so forget them and let `get` build them again
+        previous_owner_ids = getattr(
+            instance, '_easyrest_previous_owner_ids', {}).get(
+                self.resource.name, set())
+        for owner_id in previous_owner_ids | self.get_owner_ids(
+                sender, instance):
+            self.forget(owner_id)
+
+    def deleted(self, sender, instance, **kwargs):
+        for owner_id in self.get_owner_ids(sender, instance):
+            self.forget(owner_id)
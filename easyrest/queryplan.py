@@ -0,0 +1,69 @@
+import re
+
+from django.db import connections
+
+EXPLAIN = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+    'mysql': 'EXPLAIN ',
+}
+MAX_CACHED_PLANS = 1000
+POSTGRES_COST = re.compile(r'cost=[\d.]+\.\.([\d.]+)')
+
+_plans = {}
+
+
+class QueryRejected(Exception):
+    pass
+
+
+def get_plan(qs):
+    """
+    I return the query plan of `qs` as a list of dicts, one per row
+    of EXPLAIN output. Plans are cached per query shape, that is
+    per SQL text without its params.
+    """
+    connection = connections[qs.db]
+    sql, params = qs.query.sql_with_params()
+    if connection.vendor not in EXPLAIN:
+        return []
+    key = (qs.db, sql)
+    if key not in _plans:
+        if len(_plans) >= MAX_CACHED_PLANS:
+            _plans.clear()
+        cursor = connection.cursor()
+        cursor.execute(EXPLAIN[connection.vendor] + sql, params)
+        columns = [column[0] for column in cursor.description]
+        _plans[key] = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    return _plans[key]
+
+
+def get_plan_problems(qs, plan, max_cost=None):
+    """
+    I return what's wrong with `plan`: full scans of a table to find
+    the rows matching a filter, and an estimated cost above `max_cost`.
+    """
+    vendor = connections[qs.db].vendor
+    is_filtered = bool(qs.query.where)
+    problems = []
+    cost = None
+    for row in plan:
+        if vendor == 'sqlite':
+            detail = row.get('detail', '')
+            if (is_filtered and detail.startswith('SCAN ') and
+                    'USING' not in detail):
+                problems.append('full scan: {}'.format(detail))
+        elif vendor == 'postgresql':
+            line = list(row.values())[0]
+            if is_filtered and 'Seq Scan' in line:
+                problems.append('full scan: {}'.format(line.strip()))
+            match = POSTGRES_COST.search(line)
+            if match and cost is None:
+                cost = float(match.group(1))
+        elif vendor == 'mysql':
+            if is_filtered and row.get('type') == 'ALL':
+                problems.append('full scan of {}'.format(row.get('table')))
+            cost = (cost or 0) + (row.get('rows') or 0)
+    if max_cost is not None and cost is not None and cost > max_cost:
+        problems.append('estimated cost {} is over {}'.format(cost, max_cost))
+    return problems
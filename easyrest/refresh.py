@@ -0,0 +1,119 @@
+import logging
+import math
+import threading
+import time
+
+try:
+    from Queue import Full, Queue
+except ImportError:
+    from queue import Full, Queue
+
+from django.conf import settings
+from django.db import connection
+
+from .cache import get_cache
+
+logger = logging.getLogger('easyrest')
+
+
+class RefreshPool(object):
+    """
+    I run background refreshes on a fixed number of threads. When my
+    queue is full, new refreshes are dropped: the stale result keeps
+    being served until one gets through.
+    """
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self.queue = Queue(queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, func):
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+        try:
+            self.queue.put_nowait(func)
+            return True
+        except Full:
+            return False
+
+    def _work(self):
+        while True:
+            func = self.queue.get()
+            try:
+                func()
+            except Exception:
+                logger.exception('Background refresh failed')
+            finally:
+                # Don't hold on to this thread's database connection
+                connection.close()
+
+
+refresh_pool = RefreshPool(
+    getattr(settings, 'EASYREST_REFRESH_WORKERS', 2),
+    getattr(settings, 'EASYREST_REFRESH_QUEUE_SIZE', 100))
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def _store(key, content, status, timeout):
+    # Only successful responses are worth serving again
+    if status == 200:
+        get_cache().set(key, (content, status, time.time()), timeout)
+
+
+def _schedule_refresh(key, compute, timeout):
+    """
+    I refresh `key` in the background, once: unless this worker or,
+    through a lock in the EasyRest cache, another one already is.
+    """
+    cache = get_cache()
+    lock_key = '{}:refreshing'.format(key)
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    if not cache.add(lock_key, 1, timeout):
+        with _refreshing_lock:
+            _refreshing.discard(key)
+        return
+
+    def refresh():
+        try:
+            _store(key, *compute(), timeout=timeout)
+        finally:
+            cache.delete(lock_key)
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    if not refresh_pool.submit(refresh):
+        cache.delete(lock_key)
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+def get_or_refresh(key, compute, max_age, stale_ttl):
+    """
+    I return `(content, status, age)` for `key`. Results younger than
+    `max_age` seconds are returned as they are. Results up to
+    `stale_ttl` seconds older than that are returned too, while a
+    fresh one is computed in the background. Otherwise I call `compute`.
+    """
+    key = '{}:swr'.format(key)
+    timeout = int(math.ceil(max_age + stale_ttl)) or 1
+    entry = get_cache().get(key)
+    if entry is not None:
+        content, status, computed_at = entry
+        age = max(0, time.time() - computed_at)
+        if age < max_age + stale_ttl:
+            if age >= max_age:
+                _schedule_refresh(key, compute, timeout)
+            return content, status, age
+    content, status = compute()
+    _store(key, content, status, timeout)
+    return content, status, 0
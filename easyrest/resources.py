@@ -1,9 +1,61 @@
+import logging
+
+from .queryplan import QueryRejected, get_plan, get_plan_problems
+
+logger = logging.getLogger('easyrest')
+
+COMPUTED_FIELD_LOOKUPS = {
+    'exact': '=',
+    'gt': '>',
+    'gte': '>=',
+    'lt': '<',
+    'lte': '<=',
+}
+
+
+def _number(value):
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+
+
 class APIResource(object):
     model = None
     results_per_page = None
     user_field_to_restrict_by = None
     needs_authorization = False
     name = None
+    coalesce_requests = False
+    coalesce_across_processes = False
+    coalesce_timeout = 10
+    computed_fields = {}
+    columns = None
+    # Performance budgets, see `easyrest.testing.check_budgets`
+    max_list_queries = None
+    max_item_queries = None
+    constant_list_queries = False
+    max_list_ms = None
+    max_page = None
+    # Query plan guard: None, 'reject' or 'downgrade'
+    query_plan_guard = None
+    max_query_cost = None
+    downgraded_results = 20
+    # Admission control, see `easyrest.throttle`
+    rate_limit = None
+    max_concurrent_requests = None
+    max_concurrent_requests_per_user = None
+    request_cost = 1
+    unpaginated_list_cost = 10
+    # Owned id index, see `easyrest.ownership`
+    index_owned_ids = False
+    owned_ids_timeout = 300
+    owned_ids = None
+    # Serve list responses up to `max_age + stale_ttl` seconds old,
+    # refreshing them in the background after `max_age`
+    max_age = None
+    stale_ttl = 0
 
     def serialize(self, instance):
         raise NotImplementedError
@@ -11,21 +63,39 @@ class APIResource(object):
     def authorize(self, request):
         pass
 
+    def get_request_cost(self, is_list):
+        """
+        I return how many rate limit tokens a request costs.
+        """
+        if is_list and self.results_per_page is None:
+            return self.request_cost * self.unpaginated_list_cost
+        return self.request_cost
+
     def get_queryset(self, get_params):
         return self.model.objects.all()
 
     def get_list(self, get_params, user=None):
+        try:
+            return {"items": list(self.get_rows(get_params, user))}
+        except QueryRejected as e:
+            return {"error": str(e)}
+
+    def get_rows(self, get_params, user=None):
         qs = self.get_queryset(get_params)
+        qs = self.filter_and_order_by_computed_fields(qs, get_params)
         # Restrict by user if `user_field_to_restrict_by` is specified
         qs = (self.filter_by_user(qs, user)
               if (user and self.user_field_to_restrict_by) else qs)
-        qs = self.paginate(qs, get_params.get('page'))
-        return {"items": [self.serialize(obj) for obj in qs.iterator()]}
+        results_per_page = self.results_per_page
+        if self.query_plan_guard:
+            results_per_page = self.guard_query(qs, results_per_page)
+        qs = self.paginate(qs, get_params.get('page'), results_per_page)
+        return (self._serialize(obj) for obj in qs.iterator())
 
     def get_one(self, get_params, _id, user=None):
         # Try to find the object
         try:
-            item = self.model.objects.get(id=_id)
+            item = self.annotate(self.model.objects.all()).get(id=_id)
         except self.model.DoesNotExist:
             return {'error': 'No result matches id: {}'.format(_id)}
 
@@ -34,21 +104,105 @@ class APIResource(object):
         # So check that there is an object with this _id that is owned by
         # `user`
         if (self.user_field_to_restrict_by and
-            not (self.filter_by_user(self.get_queryset(get_params), user)
-                 .filter(pk=_id)
-                 .exists())):
+                not self.is_owned_by(get_params, _id, user)):
             return {"error": "You do not have access to this data"}
-        return self.serialize(item)
+        return self._serialize(item)
 
-    def paginate(self, qs, page):
+    def _serialize(self, instance):
+        data = self.serialize(instance)
+        for name in self.computed_fields:
+            data[name] = getattr(instance, self._computed_alias(name))
+        return data
+
+    def _computed_alias(self, name):
+        # Computed values are selected under their own alias so they
+        # never clash with a model property of the same name
+        return 'computed_{}'.format(name)
+
+    def annotate(self, qs):
+        if not self.computed_fields:
+            return qs
+        return qs.extra(select=dict(
+            (self._computed_alias(name), sql)
+            for name, sql in self.computed_fields.items()))
+
+    def filter_and_order_by_computed_fields(self, qs, get_params):
+        if not self.computed_fields:
+            return qs
+        qs = self.annotate(qs)
+
+        # Filter, e.g. ?popularity__gte=10
+        for param, value in get_params.items():
+            name, _, lookup = param.partition('__')
+            # Values that aren't numbers are ignored, like unknown lookups
+            if (name in self.computed_fields and
+                    (lookup or 'exact') in COMPUTED_FIELD_LOOKUPS and
+                    _number(value) is not None):
+                qs = qs.extra(
+                    where=['({}) {} %s'.format(
+                        self.computed_fields[name],
+                        COMPUTED_FIELD_LOOKUPS[lookup or 'exact'])],
+                    params=[_number(value)])
+
+        # Order, e.g. ?ordering=-popularity
+        order_by = []
+        for field in get_params.get('ordering', '').split(','):
+            name = field.lstrip('-')
+            if name in self.computed_fields:
+                order_by.append(('-' if field.startswith('-') else '') +
+                                self._computed_alias(name))
+        return qs.extra(order_by=order_by) if order_by else qs
+
+    def guard_query(self, qs, results_per_page):
+        """
+        I look at the query plan of `qs` before it runs and return how
+        many results per page to serve. If it's too expensive, I reject
+        it, or downgrade it to pages of at most `downgraded_results`.
+        """
+        plan = get_plan(qs)
+        problems = get_plan_problems(qs, plan, self.max_query_cost)
+        if not problems:
+            return results_per_page
+        self.report_expensive_query(qs, plan, problems)
+        if self.query_plan_guard == 'downgrade':
+            return min(results_per_page or self.downgraded_results,
+                       self.downgraded_results)
+        raise QueryRejected('This search is too expensive')
+
+    def report_expensive_query(self, qs, plan, problems):
+        """
+        I am called with every query the guard rejects or downgrades.
+        Override me to send them wherever you track these things.
+        """
+        logger.warning('%s: %s query: %s (%s)', self.name,
+                       self.query_plan_guard, qs.query.sql_with_params()[0],
+                       '; '.join(problems))
+
+    def paginate(self, qs, page, results_per_page=None):
         page = int(page or 1)
-        if self.results_per_page is None:
+        results_per_page = results_per_page or self.results_per_page
+        if results_per_page is None:
             return qs
-        start = (page - 1) * self.results_per_page
-        finish = page * self.results_per_page
+        if self.max_page is not None and page > self.max_page:
+            raise QueryRejected(
+                'Page {} is past the last page allowed, {}'.format(
+                    page, self.max_page))
+        start = (page - 1) * results_per_page
+        finish = page * results_per_page
         return qs[start:finish]
 
+    def is_owned_by(self, get_params, _id, user):
+        if self.owned_ids is not None:
+            # The index saves the join, not the `get_queryset` check
+            return (self.owned_ids.contains(user.id, int(_id)) and
+                    self.get_queryset(get_params).filter(pk=_id).exists())
+        return (self.filter_by_user(self.get_queryset(get_params), user)
+                .filter(pk=_id)
+                .exists())
+
     def filter_by_user(self, qs, user):
+        if self.owned_ids is not None:
+            return self.owned_ids.filter(qs, user.id)
         return qs.filter(**{self.user_field_to_restrict_by: user.id})
 
     @property
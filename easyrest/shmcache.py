@@ -0,0 +1,304 @@
+"A cache backend shared by all the workers on a host through a mmap'd file."
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from django.core.cache import get_cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache.backends.base import BaseCache
+
+MAGIC = b'EZRSHM01'
+# magic, number of slots, slot size
+TABLE_HEADER = struct.Struct('<8sII')
+# version, key hash, expiry, payload length, reference bit
+SLOT_HEADER = struct.Struct('<IQdIB')
+REF_BIT_OFFSET = SLOT_HEADER.size - 1
+# How many neighbouring slots a key may live in
+PROBES = 8
+READ_RETRIES = 10
+
+
+def _hash(key):
+    h = struct.unpack('<Q', hashlib.md5(key.encode('utf-8')).digest()[:8])[0]
+    # 0 marks an empty slot
+    return h or 1
+
+
+class SharedMemoryCache(BaseCache):
+    """
+    I keep a fixed-size hash table in a memory-mapped file, so every
+    worker on the host shares one copy of the cached data.
+
+    Reads don't take any lock: every slot carries a version number that
+    writers make odd while they are writing, and readers retry when the
+    version is odd or changed while they were reading (a seqlock).
+    Writers serialize on a `flock` of the file. When all the slots a key
+    may live in are taken, one of them is evicted with the CLOCK
+    algorithm.
+
+    Values that don't fit in a slot are only stored in the `FALLBACK`
+    cache, if you configure one. Misses are looked up there too, but
+    not copied back into shared memory, since the fallback can't tell
+    how long they have left to live. Each host's shared memory only
+    holds what was set on that host, and deleting or updating a key on
+    one host doesn't reach the shared memory of the others, so with a
+    fallback, values only stay in shared memory for `LOCAL_TIMEOUT`
+    seconds at most. That makes me fit for read-mostly lookups, not for
+    state that changes all the time, like locks and counters.
+
+        CACHES = {
+            'easyrest': {
+                'BACKEND': 'easyrest.shmcache.SharedMemoryCache',
+                'LOCATION': '/dev/shm/easyrest',
+                'OPTIONS': {
+                    'SLOTS': 4096,
+                    'SLOT_SIZE': 4096,
+                    'FALLBACK': 'default',
+                    'LOCAL_TIMEOUT': 10,
+                },
+            },
+        }
+    """
+    def __init__(self, location, params):
+        super(SharedMemoryCache, self).__init__(params)
+        options = params.get('OPTIONS', {})
+        self._path = location
+        self._slots = int(options.get('SLOTS', 4096))
+        self._slot_size = int(options.get('SLOT_SIZE', 4096))
+        self._fallback_alias = options.get('FALLBACK')
+        self._local_timeout = float(options.get('LOCAL_TIMEOUT', 10))
+        self._fallback = None
+        self._map = None
+        self._fd = None
+        self._lock = threading.Lock()
+
+    @property
+    def fallback(self):
+        if self._fallback is None and self._fallback_alias:
+            self._fallback = get_cache(self._fallback_alias)
+        return self._fallback
+
+    @property
+    def table(self):
+        if self._map is None:
+            self._open()
+        return self._map
+
+    def _open(self):
+        size = TABLE_HEADER.size + self._slots * self._slot_size
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            header = os.read(fd, TABLE_HEADER.size)
+            if not header:
+                os.ftruncate(fd, size)
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.write(fd, TABLE_HEADER.pack(
+                    MAGIC, self._slots, self._slot_size))
+            laid_out = (len(header) in (0, TABLE_HEADER.size) and
+                        (not header or TABLE_HEADER.unpack(header) ==
+                         (MAGIC, self._slots, self._slot_size)) and
+                        os.fstat(fd).st_size == size)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        if not laid_out:
+            # Other processes may have it mapped, so don't touch it
+            os.close(fd)
+            raise ImproperlyConfigured(
+                "{} isn't laid out for {} slots of {} bytes; remove it "
+                "or use another LOCATION".format(
+                    self._path, self._slots, self._slot_size))
+        self._fd = fd
+        self._map = mmap.mmap(fd, size)
+
+    @contextmanager
+    def _locked(self):
+        self.table  # make sure the file is open
+        # flock doesn't exclude threads sharing the file descriptor
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _offset(self, index):
+        return TABLE_HEADER.size + index * self._slot_size
+
+    def _indexes(self, key_hash):
+        start = key_hash % self._slots
+        return [(start + i) % self._slots
+                for i in range(min(PROBES, self._slots))]
+
+    def _read(self, key):
+        """
+        I return `(found, value)` for `key` without taking any lock.
+        """
+        return self._read_entry(key)[:2]
+
+    def _read_entry(self, key):
+        """
+        I return `(found, value, expires)` for `key`.
+        """
+        table = self.table
+        key_hash = _hash(key)
+        for index in self._indexes(key_hash):
+            offset = self._offset(index)
+            for _ in range(READ_RETRIES):
+                version, slot_hash, expires, length, _ = \
+                    SLOT_HEADER.unpack_from(table, offset)
+                if version % 2:
+                    continue
+                if slot_hash != key_hash:
+                    break
+                start = offset + SLOT_HEADER.size
+                payload = table[start:start + min(
+                    length, self._slot_size - SLOT_HEADER.size)]
+                if SLOT_HEADER.unpack_from(table, offset)[0] != version:
+                    continue
+                if expires < time.time():
+                    return False, None, None
+                try:
+                    stored_key, value = pickle.loads(payload)
+                except Exception:
+                    return False, None, None
+                if stored_key != key:
+                    break
+                struct.pack_into('<B', table, offset + REF_BIT_OFFSET, 1)
+                return True, value, expires
+        return False, None, None
+
+    def _find_slot(self, key_hash):
+        """
+        I pick the slot to write `key_hash` to: the one already holding
+        it, else an empty or expired one, else a CLOCK victim.
+        """
+        table = self.table
+        indexes = self._indexes(key_hash)
+        now = time.time()
+        free = None
+        for index in indexes:
+            _, slot_hash, expires, _, _ = SLOT_HEADER.unpack_from(
+                table, self._offset(index))
+            if slot_hash == key_hash:
+                return index
+            if free is None and (not slot_hash or expires < now):
+                free = index
+        if free is not None:
+            return free
+        # Give recently read slots a second chance
+        for index in indexes:
+            ref_offset = self._offset(index) + REF_BIT_OFFSET
+            if not struct.unpack_from('<B', table, ref_offset)[0]:
+                return index
+            struct.pack_into('<B', table, ref_offset, 0)
+        return indexes[0]
+
+    def _write(self, index, key_hash, expires, payload):
+        table = self.table
+        offset = self._offset(index)
+        version = SLOT_HEADER.unpack_from(table, offset)[0]
+        struct.pack_into('<I', table, offset, version + 1)
+        start = offset + SLOT_HEADER.size
+        table[start:start + len(payload)] = payload
+        SLOT_HEADER.pack_into(table, offset, version + 1, key_hash,
+                              expires, len(payload), 0)
+        struct.pack_into('<I', table, offset, (version + 2) % 2 ** 32)
+
+    def _store(self, key, value, timeout, only_if_missing=False):
+        payload = pickle.dumps((key, value), pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self._slot_size - SLOT_HEADER.size:
+            return False
+        if timeout is None:
+            timeout = self.default_timeout
+        if self.fallback is not None:
+            # Other hosts' changes only reach us through the fallback
+            timeout = min(timeout, self._local_timeout)
+        key_hash = _hash(key)
+        with self._locked():
+            if only_if_missing and self._read(key)[0]:
+                return False
+            self._write(self._find_slot(key_hash), key_hash,
+                        time.time() + timeout, payload)
+        return True
+
+    def add(self, key, value, timeout=None, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        if self.fallback is not None:
+            # Let the fallback tier decide, since it sees every host
+            if not self.fallback.add(key, value, timeout):
+                return False
+            self._store(key, value, timeout)
+            return True
+        return self._store(key, value, timeout, only_if_missing=True)
+
+    def get(self, key, default=None, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        found, value = self._read(key)
+        if found:
+            return value
+        if self.fallback is not None:
+            return self.fallback.get(key, default)
+        return default
+
+    def set(self, key, value, timeout=None, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self._store(key, value, timeout)
+        if self.fallback is not None:
+            self.fallback.set(key, value, timeout)
+
+    def _forget(self, key):
+        key_hash = _hash(key)
+        with self._locked():
+            for index in self._indexes(key_hash):
+                offset = self._offset(index)
+                if SLOT_HEADER.unpack_from(self.table, offset)[1] == key_hash:
+                    self._write(index, 0, 0, b'')
+
+    def delete(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self._forget(key)
+        if self.fallback is not None:
+            self.fallback.delete(key)
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        if self.fallback is not None:
+            # The count lives in the fallback, drop any stale local copy
+            self._forget(key)
+            return self.fallback.incr(key, delta)
+        with self._locked():
+            found, value, expires = self._read_entry(key)
+            if not found:
+                raise ValueError("Key '%s' not found" % key)
+            value += delta
+            key_hash = _hash(key)
+            payload = pickle.dumps((key, value), pickle.HIGHEST_PROTOCOL)
+            self._write(self._find_slot(key_hash), key_hash, expires, payload)
+        return value
+
+    def has_key(self, key, version=None):
+        return self.get(key, version=version) is not None
+
+    def clear(self):
+        with self._locked():
+            for index in range(self._slots):
+                self._write(index, 0, 0, b'')
+        if self.fallback is not None:
+            self.fallback.clear()
@@ -0,0 +1,180 @@
+import json
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+
+from .views import ItemView, ListView
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+class CaptureQueries(object):
+    """
+    I record the SQL run and the time taken inside a `with` block.
+    """
+    def __enter__(self):
+        self.use_debug_cursor = connection.use_debug_cursor
+        connection.use_debug_cursor = True
+        self.start = len(connection.queries)
+        self.started_at = time.time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.ms = (time.time() - self.started_at) * 1000
+        self.queries = [query['sql']
+                        for query in connection.queries[self.start:]]
+        connection.use_debug_cursor = self.use_debug_cursor
+
+    def __len__(self):
+        return len(self.queries)
+
+
+def _report(resource, message, queries):
+    return '\n'.join(['{}: {}'.format(resource.name, message)] +
+                     ['    {}'.format(sql) for sql in queries])
+
+
+@contextmanager
+def _overriding(resource, **attrs):
+    """
+    I set `attrs` on `resource` for the duration of a `with` block.
+    """
+    originals = dict((name, resource.__dict__[name])
+                     for name in attrs if name in resource.__dict__)
+    for name, value in attrs.items():
+        setattr(resource, name, value)
+    try:
+        yield
+    finally:
+        for name in attrs:
+            if name in originals:
+                setattr(resource, name, originals[name])
+            else:
+                delattr(resource, name)
+
+
+@contextmanager
+def _measuring(resource, **attrs):
+    """
+    I turn off what would keep `resource` from running its queries
+    inside a `with` block: responses served from a cache run none, and
+    rate limits would turn the requests down.
+    """
+    attrs.update(coalesce_requests=False, max_age=None, rate_limit=None,
+                 max_concurrent_requests=None,
+                 max_concurrent_requests_per_user=None)
+    with override_settings(EASYREST_RATE_LIMIT=None):
+        with _overriding(resource, **attrs):
+            yield
+
+
+def _get_list(resource, data, results_per_page=None):
+    overrides = {}
+    if results_per_page:
+        overrides['results_per_page'] = results_per_page
+    with _measuring(resource, **overrides):
+        request = RequestFactory().get('/', data)
+        with CaptureQueries() as captured:
+            response = ListView.as_view(resource=resource)(request)
+            content = response.content
+    return response, content, captured
+
+
+def _get_item(resource, data, _id):
+    with _measuring(resource):
+        request = RequestFactory().get('/', data)
+        with CaptureQueries() as captured:
+            response = ItemView.as_view(resource=resource)(
+                request, _id=str(_id))
+    return response, captured
+
+
+def _get_item_id(resource, data, user):
+    qs = resource.get_queryset(data)
+    if user and resource.user_field_to_restrict_by:
+        qs = resource.filter_by_user(qs, user)
+    ids = list(qs.values_list('pk', flat=True)[:1])
+    return ids[0] if ids else None
+
+
+def check_resource_budgets(resource, data=None):
+    """
+    I run a list and an item request for `resource` through the views
+    and return a report for every budget it exceeds.
+    """
+    data = data or {}
+    failures = []
+
+    if resource.max_list_queries is not None or resource.max_list_ms:
+        response, content, captured = _get_list(resource, data)
+        if response.status_code != 200:
+            failures.append(_report(resource, 'list request returned {}'
+                                    .format(response.status_code), []))
+            return failures
+        if (resource.max_list_queries is not None and
+                len(captured) > resource.max_list_queries):
+            failures.append(_report(
+                resource, 'list request ran {} queries, budget is {}'
+                .format(len(captured), resource.max_list_queries),
+                captured.queries))
+        if resource.max_list_ms and captured.ms > resource.max_list_ms:
+            failures.append(_report(
+                resource, 'list request took {:.0f}ms for {} rows, '
+                'budget is {}ms'.format(
+                    captured.ms, len(json.loads(content).get('items', [])),
+                    resource.max_list_ms),
+                captured.queries))
+
+    if resource.constant_list_queries:
+        # An N+1 shows up as more queries when there are more rows
+        one, _, one_row = _get_list(resource, data, results_per_page=1)
+        more, _, more_rows = _get_list(resource, data, results_per_page=10)
+        if one.status_code != 200 or more.status_code != 200:
+            failures.append(_report(
+                resource, 'list requests for 1 and 10 rows returned {} '
+                'and {}'.format(one.status_code, more.status_code), []))
+        elif len(more_rows) > len(one_row):
+            failures.append(_report(
+                resource, 'list request ran {} queries for 1 row '
+                'and {} for 10 rows'.format(len(one_row), len(more_rows)),
+                more_rows.queries))
+
+    if resource.max_item_queries is not None:
+        user = None
+        if resource.needs_authorization:
+            user = resource.authorize(RequestFactory().get('/', data))
+            if not user:
+                failures.append(_report(
+                    resource, 'item request was not authorized', []))
+                return failures
+        _id = _get_item_id(resource, data, user)
+        if _id is not None:
+            response, captured = _get_item(resource, data, _id)
+            if response.status_code != 200:
+                failures.append(_report(resource, 'item request returned {}'
+                                        .format(response.status_code), []))
+            elif len(captured) > resource.max_item_queries:
+                failures.append(_report(
+                    resource, 'item request ran {} queries, budget is {}'
+                    .format(len(captured), resource.max_item_queries),
+                    captured.queries))
+
+    return failures
+
+
+def check_budgets(api, data=None):
+    """
+    I check the budgets of every resource registered with `api`,
+    passing `data` as GET params (an `apikey`, for instance),
+    and raise `BudgetExceeded` listing the offending SQL.
+    """
+    failures = []
+    for resource in api.resources:
+        failures.extend(check_resource_budgets(resource, data))
+    if failures:
+        raise BudgetExceeded('\n\n'.join(failures))
@@ -0,0 +1,111 @@
+import math
+import random
+import time
+import uuid
+
+from django.conf import settings
+
+from .cache import get_cache
+
+
+class Admission(object):
+    """
+    I am the answer to whether a request may go ahead. If it may, I hold
+    its concurrency slots until `release` is called; if not, I know how
+    many seconds it should wait before retrying.
+    """
+    def __init__(self, retry_after=None, slots=()):
+        self.retry_after = retry_after
+        self.slots = list(slots)
+
+    @property
+    def admitted(self):
+        return self.retry_after is None
+
+    def release(self):
+        cache = get_cache()
+        for key, token in self.slots:
+            # The slot may have expired while the request ran and been
+            # taken by another one, which then holds it
+            if cache.get(key) == token:
+                cache.delete(key)
+        self.slots = []
+
+
+def get_identity(request):
+    if request._user:
+        return 'user:{}'.format(request._user.pk)
+    return 'ip:{}'.format(request.META.get('REMOTE_ADDR'))
+
+
+def take_tokens(key, cost, rate, burst):
+    """
+    I take `cost` tokens from the token bucket at `key`, refilled at
+    `rate` tokens a second up to `burst`, and return how many seconds
+    to wait if there aren't enough. Costs over `burst` are charged as
+    `burst`. The bucket lives in the EasyRest cache; concurrent updates
+    may let a few extra requests through.
+    """
+    cache = get_cache()
+    now = time.time()
+    # A request costing more than a full bucket could never get in
+    cost = min(cost, burst)
+    tokens, updated_at = cache.get(key) or (burst, now)
+    tokens = min(burst, tokens + (now - updated_at) * rate)
+    if tokens < cost:
+        cache.set(key, (tokens, now), int(math.ceil(burst / rate)) + 1)
+        return int(math.ceil((cost - tokens) / rate))
+    cache.set(key, (tokens - cost, now), int(math.ceil(burst / rate)) + 1)
+
+
+def take_slot(key, limit):
+    """
+    I take one of the `limit` slots at `key` and return it as a
+    `(slot key, token)` pair, or None if they're all taken. Each slot
+    is a cache key of its own, so when one expires, because a worker
+    died mid-request, only that slot is freed.
+    """
+    cache = get_cache()
+    timeout = getattr(settings, 'EASYREST_CONCURRENCY_TIMEOUT', 60)
+    token = uuid.uuid4().hex
+    # Start anywhere, so requests don't all queue up on the first slots
+    start = random.randrange(limit)
+    for index in range(limit):
+        slot_key = '{}:{}'.format(key, (start + index) % limit)
+        if cache.add(slot_key, token, timeout):
+            return slot_key, token
+
+
+def admit(resource, request, is_list):
+    rate_limit = (resource.rate_limit or
+                  getattr(settings, 'EASYREST_RATE_LIMIT', None))
+    if not (rate_limit or resource.max_concurrent_requests or
+            resource.max_concurrent_requests_per_user):
+        return Admission()
+
+    identity = get_identity(request)
+    if rate_limit:
+        # Resources with their own rate limit get their own bucket
+        key = ('easyrest:bucket:{}:{}'.format(resource.name, identity)
+               if resource.rate_limit else
+               'easyrest:bucket:{}'.format(identity))
+        rate, burst = rate_limit
+        retry_after = take_tokens(
+            key, resource.get_request_cost(is_list), float(rate), burst)
+        if retry_after is not None:
+            return Admission(retry_after)
+
+    admission = Admission()
+    for key, limit in [
+            ('easyrest:concurrency:{}'.format(resource.name),
+             resource.max_concurrent_requests),
+            ('easyrest:concurrency:{}:{}'.format(resource.name, identity),
+             resource.max_concurrent_requests_per_user)]:
+        if not limit:
+            continue
+        slot = take_slot(key, limit)
+        if slot is None:
+            admission.release()
+            return Admission(retry_after=1)
+        admission.slots.append(slot)
+    return admission
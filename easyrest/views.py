@@ -2,16 +2,36 @@ import json
 from django.http import (
     HttpResponse,
     HttpResponseForbidden)
+from django.utils.cache import patch_vary_headers
 from django.views.generic import View
 
+from .coalesce import coalescer, request_key, run_across_processes
+from .queryplan import QueryRejected
+from .refresh import get_or_refresh
+from .throttle import admit
+
+COLUMNAR_MIMETYPE = 'application/vnd.easyrest.columnar+json'
+
 
 class BaseAPIView(View):
     resource = None
+    is_list = False
 
-    def get_response(self, data):
+    def encode(self, data):
         status = 400 if 'error' in data else 200
-        return HttpResponse(json.dumps(data), status=status,
-                            mimetype='application/json')
+        return json.dumps(data), status
+
+    def make_response(self, content, status, mimetype='application/json'):
+        return HttpResponse(content, status=status, mimetype=mimetype)
+
+    def get_response(self, data):
+        return self.make_response(*self.encode(data))
+
+    def get_throttled_response(self, retry_after):
+        response = self.make_response(
+            json.dumps({"error": "Too many requests"}), 429)
+        response['Retry-After'] = str(retry_after)
+        return response
 
     def dispatch(self, request, *args, **kwargs):
         if request.method != 'GET':
@@ -22,15 +42,103 @@ class BaseAPIView(View):
             request._user = self.resource.authorize(request)
             if not request._user:
                 return HttpResponseForbidden()
-        return super(BaseAPIView, self).dispatch(request, *args, **kwargs)
+        # Admission control happens here
+        admission = admit(self.resource, request, self.is_list)
+        if not admission.admitted:
+            return self.get_throttled_response(admission.retry_after)
+        try:
+            return super(BaseAPIView, self).dispatch(
+                request, *args, **kwargs)
+        finally:
+            admission.release()
 
 
 class ListView(BaseAPIView):
+    is_list = True
+
+    def make_response(self, content, status, mimetype='application/json'):
+        response = super(ListView, self).make_response(
+            content, status, mimetype)
+        # The format depends on the Accept header, so caches must too
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    def get_format(self, request):
+        if (request.GET.get('format') == 'columnar' or
+                COLUMNAR_MIMETYPE in request.META.get('HTTP_ACCEPT', '')):
+            return 'columnar'
+        return 'json'
+
+    def encode_columnar(self, rows):
+        """
+        I stream `{"columns": [...], "rows": [[...], ...]}`, taking the
+        columns from the resource or else from the first serialized row.
+        """
+        rows = iter(rows)
+        first = next(rows, None)
+        columns = self.resource.columns or (sorted(first) if first else [])
+        yield '{{"columns": {}, "rows": ['.format(json.dumps(columns))
+        if first is not None:
+            yield json.dumps([first.get(column) for column in columns])
+            for row in rows:
+                yield ', ' + json.dumps([row.get(column)
+                                         for column in columns])
+        yield ']}'
+
     def get(self, request, *args, **kwargs):
-        return self.get_response(
-            self.resource.get_list(
-                request.GET.dict(),
-                user=request._user))
+        get_params = request.GET.dict()
+        response_format = self.get_format(request)
+        mimetype = (COLUMNAR_MIMETYPE if response_format == 'columnar'
+                    else 'application/json')
+
+        def compute(stream=False):
+            if response_format == 'columnar':
+                try:
+                    rows = self.resource.get_rows(get_params,
+                                                  user=request._user)
+                except QueryRejected as e:
+                    return self.encode({"error": str(e)})
+                chunks = self.encode_columnar(rows)
+                return (chunks if stream else ''.join(chunks)), 200
+            return self.encode(
+                self.resource.get_list(get_params, user=request._user))
+
+        resource = self.resource
+        if not (resource.coalesce_requests or resource.max_age is not None):
+            # Concurrency slots are released when `dispatch` returns,
+            # so the work has to be done by then
+            stream = not (resource.max_concurrent_requests or
+                          resource.max_concurrent_requests_per_user)
+            return self.make_response(*compute(stream=stream),
+                                      mimetype=mimetype)
+
+        key = request_key(resource, get_params, request._user,
+                          response_format)
+
+        def compute_once():
+            if not resource.coalesce_requests:
+                return compute()
+            # Identical concurrent requests share one computation
+            if resource.coalesce_across_processes:
+                return coalescer.run(
+                    key, lambda: run_across_processes(
+                        key, compute, resource.coalesce_timeout))
+            return coalescer.run(key, compute)
+
+        if resource.max_age is None:
+            return self.make_response(*compute_once(), mimetype=mimetype)
+
+        content, status, age = get_or_refresh(
+            key, compute_once, resource.max_age, resource.stale_ttl)
+        response = self.make_response(content, status, mimetype=mimetype)
+        # Errors aren't kept, so don't let anyone else keep them either
+        if status == 200:
+            response['Age'] = str(int(age))
+            response['Cache-Control'] = (
+                '{}max-age={}, stale-while-revalidate={}'.format(
+                    'private, ' if request._user else '',
+                    resource.max_age, resource.stale_ttl))
+        return response
 
 
 class ItemView(BaseAPIView):
@@ -1,4 +1,4 @@
-from .models import Item, UserItem
+from .models import Item, ProfileItem, UserItem
 from .myauth import MyAuthenticatedResource
 from easyrest.resources import APIResource
 from easyrest.core import API
@@ -9,6 +9,9 @@ api = API()
 class ItemResource(APIResource):
     model = Item
     name = 'item'
+    max_list_queries = 1
+    max_item_queries = 1
+    constant_list_queries = True
 
     def serialize(self, item):
         return {
@@ -37,6 +40,8 @@ class PaginatedItemResource(APIResource):
     model = Item
     name = 'paginated_item'
     results_per_page = 20
+    max_list_queries = 1
+    max_list_ms = 1000
 
     def serialize(self, item):
         return {
@@ -73,6 +78,59 @@ class SearchableItemResource(APIResource):
         return base_queryset.filter(**filter_kwargs)
 
 
+class CoalescedItemResource(APIResource):
+    model = Item
+    name = 'coalesced_item'
+    coalesce_requests = True
+    coalesce_across_processes = True
+
+    def serialize(self, item):
+        return {
+            'id': item.id,
+            'text': item.text,
+            'popularity': item.popularity,
+        }
+
+
+class ComputedItemResource(APIResource):
+    model = Item
+    name = 'computed_item'
+    computed_fields = {
+        'popularity': 'status + CASE WHEN is_active THEN 1 ELSE 0 END',
+    }
+
+    def serialize(self, item):
+        return {
+            'id': item.id,
+            'text': item.text,
+        }
+
+
+class GuardedSearchableItemResource(SearchableItemResource):
+    name = 'guarded_searchable_item'
+    results_per_page = 5
+    query_plan_guard = 'reject'
+    max_page = 3
+
+
+class DowngradedSearchableItemResource(SearchableItemResource):
+    name = 'downgraded_searchable_item'
+    query_plan_guard = 'downgrade'
+    downgraded_results = 5
+
+
+class RateLimitedItemResource(PaginatedItemResource):
+    name = 'rate_limited_item'
+    rate_limit = (0.01, 2)
+    max_concurrent_requests_per_user = 1
+
+
+class StaleWhileRevalidateItemResource(SearchableItemResource):
+    name = 'stale_while_revalidate_item'
+    max_age = 60
+    stale_ttl = 600
+
+
 class AuthorizedItemResource(MyAuthenticatedResource):
     model = UserItem
     name = 'authorized_item'
@@ -100,9 +158,36 @@ class AuthorizedItemResourceByUser(MyAuthenticatedResource):
         }
 
 
+class IndexedAuthorizedItemResourceByUser(AuthorizedItemResourceByUser):
+    name = 'indexed_by_user_authorized_item'
+    index_owned_ids = True
+
+
+class IndexedProfileItemResource(MyAuthenticatedResource):
+    model = ProfileItem
+    name = 'indexed_profile_item'
+    needs_authorization = True
+    user_field_to_restrict_by = 'profile__user'
+    index_owned_ids = True
+
+    def serialize(self, item):
+        return {
+            'name': item.name,
+            'id': item.id,
+        }
+
+
 api.register(ItemResource)
 api.register(PaginatedItemResource)
 api.register(SearchableItemResource)
 api.register(ReverseOrderItemResource)
+api.register(CoalescedItemResource)
+api.register(ComputedItemResource)
+api.register(GuardedSearchableItemResource)
+api.register(DowngradedSearchableItemResource)
+api.register(RateLimitedItemResource)
+api.register(StaleWhileRevalidateItemResource)
 api.register(AuthorizedItemResource)
 api.register(AuthorizedItemResourceByUser)
+api.register(IndexedAuthorizedItemResourceByUser)
+api.register(IndexedProfileItemResource)
@@ -21,3 +21,12 @@ class UserItem(models.Model):
     name = models.CharField(max_length=250)
     user = models.ForeignKey('auth.User')
     is_active = models.BooleanField(default=False)
+
+
+class Profile(models.Model):
+    user = models.ForeignKey('auth.User')
+
+
+class ProfileItem(models.Model):
+    name = models.CharField(max_length=250)
+    profile = models.ForeignKey(Profile)
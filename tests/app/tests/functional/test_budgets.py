@@ -0,0 +1,109 @@
+from sure import expect, scenario
+
+from django.contrib.auth.models import User
+from django.test.utils import override_settings
+
+from easyrest.core import API
+from easyrest.models import APIKey
+from easyrest.testing import (
+    BudgetExceeded, check_budgets, check_resource_budgets)
+from app.api import (
+    api, AuthorizedItemResourceByUser, StaleWhileRevalidateItemResource)
+from app.models import Item, UserItem
+
+
+def create_items(context):
+    # Delete all items
+    Item.objects.all().delete()
+    # Create 30 items
+    for x in range(30):
+        Item.objects.create(
+            name="my name is {}".format(x),
+            text="my text is {}".format(x),
+            is_active=x % 2,
+            status=x)
+
+
+@scenario(create_items)
+def test_registered_resources_stay_within_budget(context):
+    check_budgets(api)
+
+
+@scenario(create_items)
+def test_cached_responses_are_measured_uncached(context):
+    class CachedItemResource(StaleWhileRevalidateItemResource):
+        name = 'cached_item'
+        coalesce_requests = True
+        coalesce_across_processes = True
+        max_list_queries = 0
+
+    cached_api = API()
+    cached_api.register(CachedItemResource)
+    # Fill the caches
+    check_resource_budgets(cached_api.resources[0])
+
+    try:
+        check_budgets(cached_api)
+    except BudgetExceeded as e:
+        report = str(e)
+    else:
+        raise AssertionError('BudgetExceeded was not raised')
+
+    expect(report).to.contain('cached_item: list request ran 1 queries')
+    expect(cached_api.resources[0].max_age).to.equal(60)
+
+
+@scenario(create_items)
+def test_budgets_are_measured_without_rate_limits(context):
+    with override_settings(EASYREST_RATE_LIMIT=(0.1, 5)):
+        check_budgets(api)
+
+
+def test_unauthorized_item_request_is_reported():
+    class UnauthorizedResource(AuthorizedItemResourceByUser):
+        max_item_queries = 4
+
+    unauthorized_api = API()
+    unauthorized_api.register(UnauthorizedResource)
+
+    try:
+        check_budgets(unauthorized_api, {'apikey': 'nobody'})
+    except BudgetExceeded as e:
+        report = str(e)
+    else:
+        raise AssertionError('BudgetExceeded was not raised')
+
+    expect(report).to.contain(
+        'by_user_authorized_item: item request was not authorized')
+
+
+def test_n_plus_one_exceeds_budget():
+    # Delete all items
+    UserItem.objects.all().delete()
+    APIKey.objects.all().delete()
+    User.objects.all().delete()
+    user = User.objects.create(username='tester', password='123')
+    for x in range(30):
+        UserItem.objects.create(
+            name="my name is {}".format(x),
+            user=user,
+            is_active=x % 2)
+    apikey = APIKey.objects.create(user=user)
+
+    class NPlusOneResource(AuthorizedItemResourceByUser):
+        # serialize follows `item.user` once per row
+        constant_list_queries = True
+        max_item_queries = 4
+
+    n_plus_one_api = API()
+    n_plus_one_api.register(NPlusOneResource)
+
+    try:
+        check_budgets(n_plus_one_api, {'apikey': apikey.token})
+    except BudgetExceeded as e:
+        report = str(e)
+    else:
+        raise AssertionError('BudgetExceeded was not raised')
+
+    expect(report).to.contain('by_user_authorized_item: list request ran')
+    expect(report).to.contain('auth_user')
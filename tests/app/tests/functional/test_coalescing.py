@@ -0,0 +1,86 @@
+import json
+import threading
+import time
+from sure import expect, scenario
+
+from django.core.urlresolvers import reverse
+from django.test.client import Client
+
+from easyrest.cache import get_cache
+from easyrest.coalesce import Coalescer, run_across_processes
+from app.models import Item
+
+client = Client()
+
+
+def create_items(context):
+    # Delete all items
+    Item.objects.all().delete()
+    # Create 30 items
+    for x in range(30):
+        Item.objects.create(
+            name="my name is {}".format(x),
+            text="my text is {}".format(x),
+            is_active=x % 2,
+            status=x)
+
+
+@scenario(create_items)
+def test_get_coalesced_list(context):
+    response = client.get(reverse('coalesced_item_list'),
+                          content_type='application/json')
+
+    expected_response_content = {
+        "items": [
+            {
+                "id": x + 1,
+                "text": "my text is {}".format(x),
+                "popularity": x + int(x % 2),
+            } for x in range(30)]}
+    expect(json.loads(response.content)).to.equal(expected_response_content)
+    expect(response.status_code).to.equal(200)
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    coalescer = Coalescer()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return 'payload'
+
+    def worker():
+        results.append(coalescer.run('key', compute))
+
+    leader = threading.Thread(target=worker)
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=worker) for x in range(5)]
+    for follower in followers:
+        follower.start()
+    # Give the followers time to join the in-flight call
+    time.sleep(0.1)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join()
+
+    expect(len(calls)).to.equal(1)
+    expect(results).to.equal(['payload'] * 6)
+
+
+def test_followers_stop_waiting_when_the_leader_leaves_no_result():
+    get_cache().clear()
+    # Another process holds the lock, then fails without a result
+    get_cache().add('failing:lock', 1, 10)
+    threading.Timer(0.1, get_cache().delete, ['failing:lock']).start()
+
+    started_at = time.time()
+    result = run_across_processes('failing', lambda: 'recomputed', 10)
+
+    expect(result).to.equal('recomputed')
+    expect(time.time() - started_at < 5).to.equal(True)
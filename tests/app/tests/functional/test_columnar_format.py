@@ -0,0 +1,65 @@
+import json
+from sure import expect, scenario
+
+from django.core.urlresolvers import reverse
+from django.test.client import Client
+
+from app.models import Item
+
+client = Client()
+
+
+def create_items(context):
+    # Delete all items
+    Item.objects.all().delete()
+    # Create 30 items
+    for x in range(30):
+        Item.objects.create(
+            name="my name is {}".format(x),
+            text="my text is {}".format(x),
+            is_active=x % 2,
+            status=x)
+
+
+@scenario(create_items)
+def test_get_list_columnar_with_format_param(context):
+    response = client.get(reverse('paginated_item_list'),
+                          data={'format': 'columnar'},
+                          content_type='application/json')
+
+    expected_response_content = {
+        "columns": ["id", "popularity", "text"],
+        "rows": [
+            [x + 1, x + int(x % 2), "my text is {}".format(x)]
+            for x in range(20)]}
+    expect(json.loads(response.content)).to.equal(expected_response_content)
+    expect(response.status_code).to.equal(200)
+
+
+@scenario(create_items)
+def test_get_list_columnar_with_accept_header(context):
+    response = client.get(
+        reverse('item_list'),
+        HTTP_ACCEPT='application/vnd.easyrest.columnar+json')
+
+    expected_response_content = {
+        "columns": ["id", "popularity", "text"],
+        "rows": [
+            [x + 1, x + int(x % 2), "my text is {}".format(x)]
+            for x in range(30)]}
+    expect(json.loads(response.content)).to.equal(expected_response_content)
+    expect(response['Content-Type']).to.equal(
+        'application/vnd.easyrest.columnar+json')
+    expect(response['Vary']).to.equal('Accept')
+    expect(response.status_code).to.equal(200)
+
+
+def test_get_empty_list_columnar():
+    Item.objects.all().delete()
+    response = client.get(reverse('item_list'),
+                          data={'format': 'columnar'},
+                          content_type='application/json')
+
+    expect(json.loads(response.content)).to.equal(
+        {"columns": [], "rows": []})
+    expect(response.status_code).to.equal(200)
@@ -0,0 +1,78 @@
+import json
+from sure import expect, scenario
+
+from django.core.urlresolvers import reverse
+from django.test.client import Client
+
+from app.models import Item
+
+client = Client()
+
+
+def create_items(context):
+    # Delete all items
+    Item.objects.all().delete()
+    # Create 30 items
+    for x in range(30):
+        Item.objects.create(
+            name="my name is {}".format(x),
+            text="my text is {}".format(x),
+            is_active=x % 2,
+            status=x)
+
+
+@scenario(create_items)
+def test_get_list_with_computed_field(context):
+    response = client.get(reverse('computed_item_list'),
+                          content_type='application/json')
+
+    expected_response_content = {
+        "items": [
+            {
+                "id": x + 1,
+                "text": "my text is {}".format(x),
+                "popularity": x + int(x % 2),
+            } for x in range(30)]}
+    expect(json.loads(response.content)).to.equal(expected_response_content)
+    expect(response.status_code).to.equal(200)
+
+
+@scenario(create_items)
+def test_get_list_ordered_and_filtered_by_computed_field(context):
+    response = client.get(reverse('computed_item_list'),
+                          data={'ordering': '-popularity',
+                                'popularity__gte': 26},
+                          content_type='application/json')
+
+    items = json.loads(response.content)["items"]
+    expect([item["popularity"] for item in items]).to.equal(
+        [30, 28, 28, 26, 26])
+    expect(sorted(item["id"] for item in items)).to.equal(
+        [26, 27, 28, 29, 30])
+    expect(response.status_code).to.equal(200)
+
+
+@scenario(create_items)
+def test_get_list_with_malformed_computed_field_params(context):
+    response = client.get(reverse('computed_item_list'),
+                          data={'ordering': '--popularity',
+                                'popularity__gte': 'lots'},
+                          content_type='application/json')
+
+    items = json.loads(response.content)["items"]
+    expect(len(items)).to.equal(30)
+    expect(items[0]["popularity"]).to.equal(30)
+    expect(response.status_code).to.equal(200)
+
+
+@scenario(create_items)
+def test_get_item_with_computed_field(context):
+    response = client.get(reverse('computed_item_item', kwargs={"_id": 2}),
+                          content_type='application/json')
+
+    expected_response_content = {
+        "id": 2,
+        "text": "my text is 1",
+        "popularity": 2}
+    expect(json.loads(response.content)).to.equal(expected_response_content)
+    expect(response.status_code).to.equal(200)
@@ -0,0 +1,170 @@
+import json
+from sure import expect, scenario
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.urlresolvers import reverse
+from django.test.client import Client
+
+from easyrest.cache import get_cache
+from easyrest.models import APIKey
+from easyrest.ownership import OwnedIds
+from app.api import IndexedAuthorizedItemResourceByUser
+from app.models import Profile, ProfileItem, UserItem
+
+client = Client()
+
+
+def create_user_items(context):
+    get_cache().clear()
+    # Delete all items
+    UserItem.objects.all().delete()
+    APIKey.objects.all().delete()
+    User.objects.all().delete()
+    context.user = User.objects.create(username='tester', password='123')
+    context.user2 = User.objects.create(username='tester2', password='345')
+
+    # Create 30 items
+    for x in range(30):
+        UserItem.objects.create(
+            name="my name is {}".format(x),
+            user=[context.user, context.user2][x % 2],
+            is_active=x % 2)
+
+    context.apikey = APIKey.objects.create(user=context.user)
+
+
+@scenario(create_user_items)
+def test_get_list_filter_by_owned_ids(context):
+    response = client.get(reverse('indexed_by_user_authorized_item_list'),
+                          data={'apikey': context.apikey.token},
+                          content_type='application/json')
+
+    expected_response_content = {
+        "items": [
+            {
+                "id": x + 1,
+                "name": "my name is {}".format(x),
+                "user_id": context.user.id,
+            } for x in range(0, 30, 2)]}
+    expect(json.loads(response.content)).to.equal(expected_response_content)
+    expect(response.status_code).to.equal(200)
+
+
+@scenario(create_user_items)
+def test_get_item_checks_owned_ids(context):
+    response = client.get(
+        reverse('indexed_by_user_authorized_item_item', kwargs={"_id": 1}),
+        data={'apikey': context.apikey.token},
+        content_type='application/json')
+    expect(response.status_code).to.equal(200)
+
+    response = client.get(
+        reverse('indexed_by_user_authorized_item_item', kwargs={"_id": 2}),
+        data={'apikey': context.apikey.token},
+        content_type='application/json')
+    expect(json.loads(response.content)).to.equal(
+        {"error": "You do not have access to this data"})
+    expect(response.status_code).to.equal(400)
+
+
+@scenario(create_user_items)
+def test_owned_ids_follow_saves_and_deletes(context):
+    url = reverse('indexed_by_user_authorized_item_list')
+    # Build the owned ids
+    client.get(url, data={'apikey': context.apikey.token})
+
+    item = UserItem.objects.get(pk=2)
+    item.user = context.user
+    item.save()
+    UserItem.objects.get(pk=1).delete()
+
+    response = client.get(url, data={'apikey': context.apikey.token})
+    ids = [item["id"] for item in json.loads(response.content)["items"]]
+    expect(ids).to.equal([2] + list(range(3, 30, 2)))
+
+
+@scenario(create_user_items)
+def test_previous_owner_loses_access(context):
+    url = reverse('indexed_by_user_authorized_item_item', kwargs={"_id": 1})
+    response = client.get(url, data={'apikey': context.apikey.token})
+    expect(response.status_code).to.equal(200)
+
+    item = UserItem.objects.get(pk=1)
+    item.user = context.user2
+    item.save()
+
+    response = client.get(url, data={'apikey': context.apikey.token})
+    expect(response.status_code).to.equal(400)
+
+
+@scenario(create_user_items)
+def test_get_item_still_applies_get_queryset(context):
+    class ActiveItemResource(IndexedAuthorizedItemResourceByUser):
+        def get_queryset(self, get_params):
+            return self.model.objects.filter(is_active=True)
+
+    resource = ActiveItemResource()
+    resource.owned_ids = OwnedIds(resource)
+    # Item 1 belongs to the user but isn't active
+    expect(resource.is_owned_by({}, 1, context.user)).to.equal(False)
+    expect(resource.is_owned_by({}, 2, context.user2)).to.equal(True)
+
+
+def create_profile_items(context):
+    get_cache().clear()
+    ProfileItem.objects.all().delete()
+    Profile.objects.all().delete()
+    APIKey.objects.all().delete()
+    User.objects.all().delete()
+    context.user = User.objects.create(username='tester', password='123')
+    context.user2 = User.objects.create(username='tester2', password='345')
+    context.profile = Profile.objects.create(user=context.user)
+    for x in range(3):
+        ProfileItem.objects.create(name="my name is {}".format(x),
+                                   profile=context.profile)
+    context.apikey = APIKey.objects.create(user=context.user)
+    context.apikey2 = APIKey.objects.create(user=context.user2)
+
+
+def get_profile_item_ids(apikey):
+    response = client.get(reverse('indexed_profile_item_list'),
+                          data={'apikey': apikey.token})
+    return [item["id"] for item in json.loads(response.content)["items"]]
+
+
+@scenario(create_profile_items)
+def test_owned_ids_follow_models_along_the_path(context):
+    expect(get_profile_item_ids(context.apikey)).to.equal([1, 2, 3])
+    expect(get_profile_item_ids(context.apikey2)).to.equal([])
+
+    context.profile.user = context.user2
+    context.profile.save()
+
+    expect(get_profile_item_ids(context.apikey)).to.equal([])
+    expect(get_profile_item_ids(context.apikey2)).to.equal([1, 2, 3])
+
+
+@scenario(create_profile_items)
+def test_deleting_along_the_path_forgets_owned_ids(context):
+    expect(get_profile_item_ids(context.apikey)).to.equal([1, 2, 3])
+
+    ProfileItem.objects.get(pk=1).delete()
+    expect(get_profile_item_ids(context.apikey)).to.equal([2, 3])
+
+    # Deletes the items too
+    context.profile.delete()
+    expect(get_profile_item_ids(context.apikey)).to.equal([])
+
+
+def test_paths_through_other_relations_are_refused():
+    class ReverseResource(IndexedAuthorizedItemResourceByUser):
+        model = User
+        user_field_to_restrict_by = 'useritem__user'
+
+    try:
+        OwnedIds(ReverseResource())
+    except ImproperlyConfigured:
+        pass
+    else:
+        raise AssertionError('ImproperlyConfigured was not raised')
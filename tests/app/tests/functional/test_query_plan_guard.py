@@ -0,0 +1,86 @@
+import json
+import logging
+from sure import expect, scenario
+
+from django.core.urlresolvers import reverse
+from django.test.client import Client
+
+from app.models import Item
+
+client = Client()
+
+
+class RecordingHandler(logging.Handler):
+    def emit(self, record):
+        self.records.append(record)
+
+
+def create_items(context):
+    # Delete all items
+    Item.objects.all().delete()
+    # Create 30 items
+    for x in range(30):
+        Item.objects.create(
+            name="my name is {}".format(x),
+            text="my text is {}".format(x),
+            is_active=x % 2,
+            status=x)
+    # Expensive queries are reported to the `easyrest` logger
+    context.handler = RecordingHandler()
+    context.handler.records = []
+    logging.getLogger('easyrest').addHandler(context.handler)
+
+
+def remove_handler(context):
+    logging.getLogger('easyrest').removeHandler(context.handler)
+
+
+@scenario(create_items, remove_handler)
+def test_unfiltered_list_is_allowed(context):
+    response = client.get(reverse('guarded_searchable_item_list'),
+                          content_type='application/json')
+
+    expect(len(json.loads(response.content)["items"])).to.equal(5)
+    expect(response.status_code).to.equal(200)
+    expect(context.handler.records).to.equal([])
+
+
+@scenario(create_items, remove_handler)
+def test_search_scanning_the_whole_table_is_rejected(context):
+    response = client.get(reverse('guarded_searchable_item_list'),
+                          data={"contains": "text"},
+                          content_type='application/json')
+
+    expect(json.loads(response.content)).to.equal(
+        {"error": "This search is too expensive"})
+    expect(response.status_code).to.equal(400)
+    expect(len(context.handler.records)).to.equal(1)
+
+
+@scenario(create_items, remove_handler)
+def test_search_scanning_the_whole_table_is_downgraded(context):
+    url = reverse('downgraded_searchable_item_list')
+    response = client.get(url, data={"contains": "text"},
+                          content_type='application/json')
+
+    expect([item["id"] for item in json.loads(response.content)["items"]])\
+        .to.equal([1, 2, 3, 4, 5])
+    expect(response.status_code).to.equal(200)
+    expect(len(context.handler.records)).to.equal(1)
+
+    # Downgraded searches are served a page at a time
+    response = client.get(url, data={"contains": "text", "page": 2},
+                          content_type='application/json')
+    expect([item["id"] for item in json.loads(response.content)["items"]])\
+        .to.equal([6, 7, 8, 9, 10])
+
+
+@scenario(create_items, remove_handler)
+def test_page_past_max_page_is_rejected(context):
+    response = client.get(reverse('guarded_searchable_item_list'),
+                          data={"page": 4},
+                          content_type='application/json')
+
+    expect(json.loads(response.content)).to.equal(
+        {"error": "Page 4 is past the last page allowed, 3"})
+    expect(response.status_code).to.equal(400)
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import time
+from sure import expect
+
+from django.contrib.auth.models import User
+from django.core.cache import get_cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test.utils import override_settings
+
+from easyrest.auth import get_user_from_token
+from easyrest.models import APIKey
+from easyrest.shmcache import SharedMemoryCache
+
+
+def make_cache(**options):
+    path = os.path.join(tempfile.mkdtemp(), 'easyrest')
+    options.setdefault('SLOTS', 64)
+    options.setdefault('SLOT_SIZE', 512)
+    return SharedMemoryCache(path, {'OPTIONS': options})
+
+
+def test_set_get_delete():
+    cache = make_cache()
+    cache.set('answer', {'value': 42})
+    expect(cache.get('answer')).to.equal({'value': 42})
+    cache.delete('answer')
+    expect(cache.get('answer')).to.equal(None)
+
+
+def test_add_only_sets_missing_keys():
+    cache = make_cache()
+    expect(cache.add('lock', 1)).to.equal(True)
+    expect(cache.add('lock', 2)).to.equal(False)
+    expect(cache.get('lock')).to.equal(1)
+
+
+def test_expired_values_are_gone():
+    cache = make_cache()
+    cache.set('soon', 1, 0.01)
+    time.sleep(0.02)
+    expect(cache.get('soon')).to.equal(None)
+
+
+def test_values_are_shared_between_instances():
+    cache = make_cache()
+    cache.set('shared', 'yes')
+    other = SharedMemoryCache(cache._path, {'OPTIONS': {
+        'SLOTS': 64, 'SLOT_SIZE': 512}})
+    expect(other.get('shared')).to.equal('yes')
+
+
+def test_full_table_evicts_instead_of_growing():
+    cache = make_cache(SLOTS=8)
+    for x in range(50):
+        cache.set('key{}'.format(x), x)
+    found = [x for x in range(50)
+             if cache.get('key{}'.format(x)) is not None]
+    expect(len(found)).to.equal(8)
+    expect(cache.get('key49')).to.equal(49)
+
+
+def test_values_too_big_for_a_slot_are_not_stored():
+    cache = make_cache()
+    cache.set('big', 'x' * 1000)
+    expect(cache.get('big')).to.equal(None)
+
+
+def test_file_laid_out_differently_is_left_alone():
+    cache = make_cache()
+    cache.set('kept', 1)
+    other = SharedMemoryCache(cache._path, {'OPTIONS': {
+        'SLOTS': 128, 'SLOT_SIZE': 512}})
+    try:
+        other.get('kept')
+    except ImproperlyConfigured:
+        pass
+    else:
+        raise AssertionError('ImproperlyConfigured was not raised')
+    expect(cache.get('kept')).to.equal(1)
+
+
+def test_fallback_hits_are_not_copied_into_shared_memory():
+    fallback = get_cache('default')
+    fallback.clear()
+    cache = make_cache(FALLBACK='default')
+    fallback.set(cache.make_key('elsewhere'), 'value', 1)
+    expect(cache.get('elsewhere')).to.equal('value')
+    expect(cache._read(cache.make_key('elsewhere'))[0]).to.equal(False)
+
+
+def test_changes_from_other_hosts_show_up_after_the_local_timeout():
+    fallback = get_cache('default')
+    fallback.clear()
+    cache = make_cache(FALLBACK='default', LOCAL_TIMEOUT=0.01)
+    cache.set('setting', 'old', 60)
+    # Another host updates it, its shared memory isn't ours
+    fallback.set(cache.make_key('setting'), 'new', 60)
+    expect(cache.get('setting')).to.equal('old')
+    time.sleep(0.02)
+    expect(cache.get('setting')).to.equal('new')
+
+
+@override_settings(EASYREST_APIKEY_CACHE_TIMEOUT=60)
+def test_apikey_lookups_are_cached_until_the_key_is_deleted():
+    APIKey.objects.all().delete()
+    User.objects.all().delete()
+    user = User.objects.create(username='tester', password='123')
+    apikey = APIKey.objects.create(user=user)
+    token = apikey.token
+
+    expect(get_user_from_token(token)).to.equal(user)
+    APIKey.objects.filter(pk=apikey.pk).update(token='changed')
+    # Served from the cache without hitting the database
+    expect(get_user_from_token(token)).to.equal(user)
+
+    apikey.delete()
+    expect(get_user_from_token(token)).to.equal(None)
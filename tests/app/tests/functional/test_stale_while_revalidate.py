@@ -0,0 +1,66 @@
+import json
+import threading
+import time
+from sure import expect
+
+from django.core.urlresolvers import reverse
+from django.test.client import Client, RequestFactory
+
+from easyrest.cache import get_cache
+from easyrest.refresh import get_or_refresh
+from easyrest.views import ListView
+from app.api import StaleWhileRevalidateItemResource
+from app.models import Item
+
+client = Client()
+
+
+def test_fresh_list_is_served_from_cache():
+    get_cache().clear()
+    Item.objects.all().delete()
+    Item.objects.create(text="Orange smoothie", status=100)
+    url = reverse('stale_while_revalidate_item_list')
+
+    response = client.get(url, data={"contains": "orange"})
+    expect(response['Age']).to.equal('0')
+    expect(response['Cache-Control']).to.equal(
+        'max-age=60, stale-while-revalidate=600')
+
+    Item.objects.create(text="orange juice", status=25)
+    response = client.get(url, data={"contains": "orange"})
+    expect(len(json.loads(response.content)["items"])).to.equal(1)
+    expect(response.status_code).to.equal(200)
+
+
+def test_errors_are_not_marked_fresh():
+    get_cache().clear()
+
+    class ShortItemResource(StaleWhileRevalidateItemResource):
+        results_per_page = 1
+        max_page = 1
+
+    request = RequestFactory().get('/', {"page": 2})
+    response = ListView.as_view(resource=ShortItemResource())(request)
+    expect(response.status_code).to.equal(400)
+    expect(response.has_header('Cache-Control')).to.equal(False)
+    expect(response.has_header('Age')).to.equal(False)
+
+
+def test_stale_result_is_served_while_refreshing():
+    get_cache().clear()
+    refreshed = threading.Event()
+
+    def compute():
+        refreshed.set()
+        return 'fresh', 200
+
+    get_cache().set('test:swr', ('stale', 200, time.time() - 120))
+    content, status, age = get_or_refresh('test', compute, 60, 600)
+    expect(content).to.equal('stale')
+    expect(age >= 120).to.equal(True)
+
+    refreshed.wait(5)
+    # Give the refresh a moment to store its result
+    time.sleep(0.1)
+    content, status, age = get_or_refresh('test', compute, 60, 600)
+    expect(content).to.equal('fresh')
@@ -0,0 +1,92 @@
+import json
+import time
+from sure import expect
+
+from django.core.urlresolvers import reverse
+from django.test.client import Client, RequestFactory
+from django.test.utils import override_settings
+
+from easyrest.cache import get_cache
+from easyrest.throttle import Admission, take_slot, take_tokens
+from easyrest.views import ListView
+from app.api import ItemResource, RateLimitedItemResource
+from app.models import Item
+
+client = Client()
+
+
+def test_requests_over_the_rate_limit_are_rejected():
+    get_cache().clear()
+    for x in range(2):
+        response = client.get(reverse('rate_limited_item_list'),
+                              content_type='application/json')
+        expect(response.status_code).to.equal(200)
+
+    response = client.get(reverse('rate_limited_item_list'),
+                          content_type='application/json')
+    expect(json.loads(response.content)).to.equal(
+        {"error": "Too many requests"})
+    expect(response.status_code).to.equal(429)
+    expect(int(response['Retry-After']) > 0).to.equal(True)
+
+
+def test_concurrency_slots_are_released():
+    get_cache().clear()
+    slot = take_slot('easyrest:concurrency:test', 1)
+    expect(slot).to.be.ok
+    expect(take_slot('easyrest:concurrency:test', 1)).to.equal(None)
+    Admission(slots=[slot]).release()
+    expect(take_slot('easyrest:concurrency:test', 1)).to.be.ok
+
+
+@override_settings(EASYREST_CONCURRENCY_TIMEOUT=1)
+def test_expired_slots_let_in_only_as_many_requests_as_they_free():
+    get_cache().clear()
+    first = take_slot('easyrest:concurrency:test', 2)
+    time.sleep(0.5)
+    second = take_slot('easyrest:concurrency:test', 2)
+    # The first request outlives its slot, another one takes it
+    time.sleep(0.6)
+    third = take_slot('easyrest:concurrency:test', 2)
+    expect(third).to.be.ok
+    expect(take_slot('easyrest:concurrency:test', 2)).to.equal(None)
+    # Releasing the first request leaves the third one's slot alone
+    Admission(slots=[first]).release()
+    expect(take_slot('easyrest:concurrency:test', 2)).to.equal(None)
+    Admission(slots=[second, third]).release()
+
+
+def test_unpaginated_lists_cost_more():
+    expect(RateLimitedItemResource().get_request_cost(is_list=True)).to.equal(
+        1)
+    expect(ItemResource().get_request_cost(is_list=True)).to.equal(10)
+    expect(ItemResource().get_request_cost(is_list=False)).to.equal(1)
+
+
+def test_expensive_requests_are_charged_at_most_a_full_bucket():
+    get_cache().clear()
+    expect(take_tokens('easyrest:bucket:test', 50, 1.0, 10)).to.equal(None)
+    expect(take_tokens('easyrest:bucket:test', 50, 1.0, 10) > 0).to.equal(
+        True)
+
+
+def test_columnar_lists_are_built_while_holding_the_slot():
+    get_cache().clear()
+    slots_held = []
+
+    class SlotCheckingResource(RateLimitedItemResource):
+        rate_limit = None
+
+        def serialize(self, item):
+            slots_held.append(get_cache().get(
+                'easyrest:concurrency:rate_limited_item:ip:127.0.0.1:0'))
+            return {'id': item.id}
+
+    Item.objects.all().delete()
+    Item.objects.create(text="Orange smoothie", status=100)
+    request = RequestFactory().get('/', {'format': 'columnar'},
+                                   REMOTE_ADDR='127.0.0.1')
+    response = ListView.as_view(resource=SlotCheckingResource())(request)
+
+    expect(json.loads(response.content)["rows"]).to.equal([[1]])
+    expect(slots_held[0]).to.be.ok